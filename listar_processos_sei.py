@@ -10,6 +10,8 @@ Requisitos:
       SEI_DEBUG=1 (opcional)
       SEI_SAVE_DEBUG_HTML=1 (opcional)
       SEI_DATA_DIR=data (opcional)
+      SEI_MAX_CONEXOES=8 (opcional)
+      SEI_PAGINACAO_PARALELA=0 (opcional)
 
 Execução:
   uv run listar_processos_sei.py
@@ -19,20 +21,31 @@ Execução:
 from __future__ import annotations
 
 import argparse
+import io
 import logging
 import math
 import os
+import queue
 import re
 import sys
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, InvalidStateError, wait
 from dataclasses import dataclass, field
+from functools import lru_cache
+from html import unescape
+from itertools import chain
+from operator import attrgetter
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Literal, Optional, Set
-from urllib.parse import parse_qs, urljoin, urlparse
+from typing import Any, Callable, Dict, Iterable, List, Literal, Optional, Set
+from urllib.parse import urljoin
+from xml.sax.saxutils import escape as xml_escape
 
+import lxml.html
 import requests
-from bs4 import BeautifulSoup, Tag
 from dotenv import load_dotenv
-from openpyxl import Workbook
+from lxml import etree
+from lxml.html import HtmlElement
 from requests.adapters import HTTPAdapter
 
 try:
@@ -56,11 +69,71 @@ DEFAULT_HEADERS = {
         "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
     ),
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Connection": "keep-alive",
 }
 
+# Limite padrão de requisições simultâneas ao SEI durante a paginação (todas vão para o mesmo host).
+DEFAULT_MAX_CONEXOES = 8
+
+# Dimensionamento do pool de conexões HTTP da sessão (ver `create_session`): poucos hosts (SIP e SEI
+# ficam na mesma origem), mas muitas conexões keep-alive por host para a paginação em paralelo.
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = 32
+
+# Parser compartilhado por todas as leituras de HTML do SEI: sem índice de ids (as buscas são via XPath)
+# e já na codificação do SEI. O lxml serializa o uso concorrente de uma mesma instância de parser.
+_HTML_PARSER = lxml.html.HTMLParser(collect_ids=False, encoding="iso-8859-1")
+
+RE_CONTROLE_HREF = re.compile(rb"""href=["']([^"']*acao=procedimento_controlar[^"']*)""", re.I)
 RE_ONCLICK_REDIRECT = re.compile(r"window\.location\.href='(?P<url>[^']+)'")
 RE_PROCESSO = re.compile(r"\b\d{4}\.\s?\d{2}\.\s?\d{7}\s*/\s*\d{4}\s*[-–—-]\s*\d{2}\b", re.I)
 RE_TOOLTIP = re.compile(r"infraTooltipMostrar\('([^']*)',\s*'([^']*)'\)", re.I)
+RE_TOOLTIP_FIRST = re.compile(r"infraTooltipMostrar\('([^']*)'", re.I)
+RE_CAPTION_TOTAL = re.compile(r"(\d+)\s+registros")
+RE_CAPTION_INTERVALO = re.compile(r"-\s*(\d+)\s*a\s*(\d+)")
+RE_ESPACOS = re.compile(r"\s+")
+# Normalização do número do processo (`canonizar_processo`).
+RE_PONTO_ESPACOS = re.compile(r"\.\s+")
+RE_BARRA_ESPACOS = re.compile(r"\s*/\s*")
+RE_HIFEN_ESPACOS = re.compile(r"\s*-\s*")
+RE_URL_IDS = re.compile(r"[?&](id_procedimento|infra_hash)=([^&#]*)")
+# Caracteres que o XML 1.0 não aceita (controles vindos do HTML quebrariam o `.xlsx`).
+RE_XML_INVALIDO = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+# Consultas XPath compiladas uma única vez e reaproveitadas em todas as páginas/linhas.
+XP_POR_ID = etree.XPath("//*[@id=$elem_id]")
+XP_LINHAS_PROCESSOS = etree.XPath(
+    '//*[@id="tblProcessosRecebidos"]//tr[starts-with(@id, "P")]'
+    ' | //*[@id="tblProcessosGerados"]//tr[starts-with(@id, "P")]'
+)
+# `smart_strings=False`: o resultado é `str` puro, sem referência de volta ao elemento (e à árvore).
+XP_TABELA_DA_LINHA = etree.XPath(
+    'ancestor::*[@id="tblProcessosRecebidos" or @id="tblProcessosGerados"][1]/@id', smart_strings=False
+)
+XP_LINHAS_P = etree.XPath('.//tr[starts-with(@id, "P")]')
+XP_CAPTION = etree.XPath(".//caption")
+XP_LINK_PROCESSO = etree.XPath('.//a[contains(@href, "acao=procedimento_trabalhar")]')
+XP_LINK_RESPONSAVEL = etree.XPath('.//a[contains(@href, "acao=procedimento_atribuicao_listar")]')
+XP_IMG_STATUS = etree.XPath('.//img[contains(concat(" ", normalize-space(@class), " "), " imagemStatus ")]')
+XP_IMG_DOCUMENTOS_NOVOS = etree.XPath('.//img[contains(@src, "exclamacao.svg")]')
+XP_IMG_ANOTACAO = etree.XPath('.//img[contains(@src, "anotacao")]')
+XP_FORM_CONTROLE = etree.XPath('//*[@id="frmProcedimentoControlar"]')
+# Linha da tabela de unidades cuja 2ª coluna (normalizada/maiúscula) é a unidade `$nome`.
+XP_LINHA_UNIDADE = etree.XPath(
+    ".//tr[not(.//th)]"
+    '[translate(normalize-space(td[2]), "abcdefghijklmnopqrstuvwxyz", "ABCDEFGHIJKLMNOPQRSTUVWXYZ") = $nome]'
+)
+XP_TABELAS_INFRA = etree.XPath(
+    '//table[starts-with(@id, "infraTable") or contains(concat(" ", normalize-space(@class), " "), " infraTable ")]'
+)
+# Linhas de dados (sem `<th>`) com ao menos 2 colunas: `tbody` quando houver, senão a tabela inteira.
+XP_LINHAS_DADOS = etree.XPath(
+    '(.//tbody//tr | self::*[not(.//tbody//tr)]//tr)[not(.//th)][count(.//td) >= 2]'
+)
+XP_CELULAS = etree.XPath(".//td")
+XP_RADIO_UNIDADE = etree.XPath('.//input[@type="radio"][@name="chkInfraItem"]')
+XP_FORM_SELECAO_UNIDADE = etree.XPath('//form[@id="frmInfraSelecaoUnidade"]')
+XP_FORMS = etree.XPath("//form")
 
 
 class SEIError(RuntimeError):
@@ -79,20 +152,33 @@ class SEIProcessoError(SEIError):
     """Falhas ao acessar/paginar/listar processos (rede, parsing, paginação indisponível)."""
 
 
+_TRUTHY = frozenset({"1", "true", "t", "yes", "y", "sim"})
+_FALSY = frozenset({"0", "false", "f", "no", "n", "nao", "não"})
+
+
 def _str_to_bool(value: Optional[str]) -> Optional[bool]:
     """Converte strings comuns para booleano, retornando None quando indefinido."""
     if value is None:
         return None
     value_norm = value.strip().lower()
-    truthy = {"1", "true", "t", "yes", "y", "sim"}
-    falsy = {"0", "false", "f", "no", "n", "nao", "não"}
-    if value_norm in truthy:
+    if value_norm in _TRUTHY:
         return True
-    if value_norm in falsy:
+    if value_norm in _FALSY:
         return False
     return None
 
 
+def _str_to_int(value: Optional[str], default: int) -> int:
+    """Converte strings para inteiro positivo, retornando `default` quando indefinido/inválido."""
+    if value is None or not value.strip():
+        return default
+    try:
+        numero = int(value.strip())
+    except ValueError:
+        return default
+    return numero if numero > 0 else default
+
+
 @dataclass(frozen=True)
 class Settings:
     """Configuração calculada a partir do ambiente (.env/variáveis de ambiente)."""
@@ -104,6 +190,12 @@ class Settings:
     data_dir: Path = field(default_factory=lambda: Path(os.environ.get("SEI_DATA_DIR", "data")))
     save_debug_html: bool = field(default_factory=lambda: _str_to_bool(os.environ.get("SEI_SAVE_DEBUG_HTML")) is True)
     debug_enabled: bool = field(default_factory=lambda: _str_to_bool(os.environ.get("SEI_DEBUG")) is True)
+    max_conexoes: int = field(
+        default_factory=lambda: _str_to_int(os.environ.get("SEI_MAX_CONEXOES"), DEFAULT_MAX_CONEXOES)
+    )
+    paginacao_paralela: bool = field(
+        default_factory=lambda: _str_to_bool(os.environ.get("SEI_PAGINACAO_PARALELA")) is not False
+    )
 
     @property
     def login_url(self) -> str:
@@ -140,21 +232,34 @@ def configure_logging(settings: Settings) -> None:
     )
 
 
-def absolute_to_sei(settings: Settings, href: str) -> str:
-    """Converte `href` relativo do SEI em URL absoluta."""
+@lru_cache(maxsize=4096)
+def _absolute_url(base: str, href: str) -> str:
+    """`urljoin` memoizado: os mesmos hrefs se repetem entre linhas, páginas e grupos."""
     if href.startswith("http"):
         return href
-    return urljoin(f"{settings.base_url}/sei/", href.lstrip("/"))
+    return urljoin(base, href.lstrip("/"))
+
 
+def absolute_to_sei(settings: Settings, href: str) -> str:
+    """Converte `href` relativo do SEI em URL absoluta."""
+    return _absolute_url(f"{settings.base_url}/sei/", href)
 
-def save_html(settings: Settings, path: Path, html: str) -> None:
-    """Salva HTML para debug quando `SEI_SAVE_DEBUG_HTML=1`."""
+
+def save_html(settings: Settings, nome_arquivo: str, conteudo: Callable[[], bytes]) -> None:
+    """
+    Salva HTML em `data/debug/` quando `SEI_SAVE_DEBUG_HTML=1` (bytes crus da resposta, em iso-8859-1).
+
+    O conteúdo e o caminho só são materializados com o debug ligado, então o custo no caminho normal
+    é apenas a checagem da flag.
+    """
     if not settings.save_debug_html:
         return
+    path = settings.data_dir / "debug" / nome_arquivo
     try:
+        html = conteudo()
         path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(html, encoding="iso-8859-1")
-        log.debug("HTML salvo: %s (%s chars)", path, len(html))
+        path.write_bytes(html)
+        log.debug("HTML salvo: %s (%s bytes)", path, len(html))
     except Exception as exc:  # pragma: no cover
         log.warning("Erro ao salvar HTML %s: %s", path, exc)
 
@@ -165,12 +270,20 @@ def create_session(settings: Settings) -> requests.Session:
 
     - O cookie `SIP_U_GOVMG_SEI` influencia o órgão selecionado no SEI.
     - Retries ajudam com instabilidades (429/5xx), sem mascarar erros de login.
+    - O pool mantém conexões keep-alive suficientes para a paginação em paralelo.
     """
     session = requests.Session()
     session.headers.update(DEFAULT_HEADERS)
     if settings.orgao_value:
         session.cookies.set("SIP_U_GOVMG_SEI", settings.orgao_value, domain="sei.mg.gov.br")
 
+    # `pool_maxsize` precisa ser >= à concorrência máxima da paginação (`settings.max_conexoes`, ou de
+    # qualquer wrapper concorrente futuro): acima disso o urllib3 descarta as conexões excedentes em vez
+    # de devolvê-las ao pool, e cada requisição seguinte volta a pagar o handshake TCP/TLS.
+    pool_kwargs = {
+        "pool_connections": HTTP_POOL_CONNECTIONS,
+        "pool_maxsize": max(HTTP_POOL_MAXSIZE, settings.max_conexoes),
+    }
     if Retry is not None:
         retry = Retry(
             total=5,
@@ -181,97 +294,80 @@ def create_session(settings: Settings) -> requests.Session:
             allowed_methods=frozenset({"GET", "POST"}),
             raise_on_status=False,
         )
-        adapter = HTTPAdapter(max_retries=retry)
-        session.mount("https://", adapter)
-        session.mount("http://", adapter)
+        adapter = HTTPAdapter(max_retries=retry, **pool_kwargs)
     else:
         log.debug("urllib3 Retry indisponível; seguindo sem retries automáticos.")
+        adapter = HTTPAdapter(**pool_kwargs)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
     return session
 
 
-def serializar_inputs(form: Tag) -> Dict[str, str]:
-    """Serializa `<input>` (incluindo radio/checkbox) para um dict `name -> value`."""
-    data: Dict[str, str] = {}
-    for inp in form.find_all("input"):
-        if not isinstance(inp, Tag):
-            continue
-        name = inp.get("name")
-        if not name:
-            continue
-        itype = (inp.get("type") or "").lower()
-        val = inp.get("value", "")
-        if itype in {"radio", "checkbox"}:
-            if inp.has_attr("checked"):
-                data[name] = val
-        else:
-            data[name] = val
-    return data
+def _parse_html(html: bytes) -> HtmlElement:
+    """Faz o parse (único) de uma página do SEI; a árvore é repassada às funções de extração."""
+    try:
+        return lxml.html.fromstring(html, parser=_HTML_PARSER)
+    except (etree.ParserError, ValueError) as exc:
+        raise SEIProcessoError(f"HTML inválido recebido do SEI: {exc}") from exc
 
 
-def serializar_selects(form: Tag) -> Dict[str, str]:
-    """Serializa `<select>` para `name -> selected value`."""
-    data: Dict[str, str] = {}
-    for sel in form.find_all("select"):
-        if not isinstance(sel, Tag):
-            continue
-        name = sel.get("name")
-        if not name:
-            continue
-        opt = sel.find("option", selected=True) or sel.find("option")
-        if opt and isinstance(opt, Tag):
-            data[name] = opt.get("value", "")
-        else:
-            data[name] = ""
-    return data
+def _texto(elem: HtmlElement, separador: str = " ") -> str:
+    """Texto de um elemento lxml, com as partes sem espaços nas bordas unidas por `separador`."""
+    return separador.join(parte.strip() for parte in elem.itertext() if parte.strip())
 
 
-def serializar_textareas(form: Tag) -> Dict[str, str]:
-    """Serializa `<textarea>` para `name -> texto`."""
-    data: Dict[str, str] = {}
-    for ta in form.find_all("textarea"):
-        if not isinstance(ta, Tag):
-            continue
-        name = ta.get("name")
-        if not name:
-            continue
-        data[name] = (ta.text or "").strip()
-    return data
+def _valor_por_id(root: HtmlElement, elem_id: str) -> Optional[str]:
+    """Retorna o atributo `value` do elemento com o `id` informado (None se não existir)."""
+    elementos = XP_POR_ID(root, elem_id=elem_id)
+    return elementos[0].get("value", "") if elementos else None
 
 
-def processar_radios_nao_marcados(form: Tag, data: Dict[str, str]) -> Dict[str, str]:
+def serializar_formulario(form: HtmlElement) -> Dict[str, str]:
     """
-    Garante que grupos de radio tenham valor mesmo sem `checked`.
+    Serializa inputs/selects/textareas em um payload de POST, percorrendo o formulário uma única vez.
 
-    O SEI às vezes espera que o campo do radio seja enviado; este fallback usa o primeiro valor.
+    - `<input>` radio/checkbox só entram quando marcados; selects usam a opção `selected` (ou a primeira).
+    - Grupos de radio sem `checked` recebem o valor do primeiro radio: o SEI às vezes espera o campo.
+    - Em nomes repetidos vale a precedência input < select < textarea.
     """
-    radios_by_name: Dict[str, List[Tag]] = {}
-    for radio in form.find_all("input", {"type": "radio"}):
-        if not isinstance(radio, Tag):
-            continue
-        name = radio.get("name")
+    inputs: Dict[str, str] = {}
+    selects: Dict[str, str] = {}
+    textareas: Dict[str, str] = {}
+    radios_by_name: Dict[str, List[HtmlElement]] = {}
+
+    for el in form.iter("input", "select", "textarea"):
+        name = el.get("name")
         if not name:
             continue
-        radios_by_name.setdefault(name, []).append(radio)
+        if el.tag == "input":
+            itype = (el.get("type") or "").lower()
+            if itype == "radio":
+                radios_by_name.setdefault(name, []).append(el)
+            if itype in {"radio", "checkbox"}:
+                if el.get("checked") is not None:
+                    inputs[name] = el.get("value", "")
+            else:
+                inputs[name] = el.get("value", "")
+        elif el.tag == "select":
+            opcoes = list(el.iter("option"))
+            opt = next((o for o in opcoes if o.get("selected") is not None), opcoes[0] if opcoes else None)
+            selects[name] = opt.get("value", "") if opt is not None else ""
+        else:
+            textareas[name] = el.text_content().strip()
+
+    data = {**inputs, **selects, **textareas}
     for name, radios in radios_by_name.items():
-        if name not in data and radios:
+        if name not in data:
             data[name] = radios[0].get("value", "")
     return data
 
 
-def serializar_formulario(form: Tag) -> Dict[str, str]:
-    """Serializa inputs/selects/textareas em um payload de POST."""
-    data: Dict[str, str] = {}
-    data.update(serializar_inputs(form))
-    data.update(serializar_selects(form))
-    data.update(serializar_textareas(form))
-    return processar_radios_nao_marcados(form, data)
-
-
-def login_sei(session: requests.Session, settings: Settings, user: str, pwd: str) -> str:
+def login_sei(session: requests.Session, settings: Settings, user: str, pwd: str) -> bytes:
     """
-    Realiza login no SEI e retorna o HTML pós-login.
+    Realiza login no SEI e retorna o HTML pós-login (bytes crus da resposta).
 
-    Observação: o SEI tipicamente responde em `iso-8859-1`, então o script força essa codificação.
+    Observação: o SEI tipicamente responde em `iso-8859-1`; o HTML segue em bytes até o parser
+    (`_HTML_PARSER`, que já assume essa codificação) e só é decodificado nas mensagens de erro.
     """
     if not user or not pwd:
         raise SEILoginError("Usuário e senha devem ser fornecidos (SEI_USER/SEI_PASS).")
@@ -280,7 +376,6 @@ def login_sei(session: requests.Session, settings: Settings, user: str, pwd: str
         log.info("Abrindo página de login…")
         response = session.get(settings.login_url, timeout=30, headers=DEFAULT_HEADERS)
         response.raise_for_status()
-        response.encoding = "iso-8859-1"
 
         session.cookies.set("SIP_U_GOVMG_SEI", settings.orgao_value, domain="sei.mg.gov.br")
 
@@ -295,13 +390,13 @@ def login_sei(session: requests.Session, settings: Settings, user: str, pwd: str
         log.info("Enviando POST de login…")
         response = session.post(settings.login_url, data=data, timeout=30, headers=DEFAULT_HEADERS, allow_redirects=True)
         response.raise_for_status()
-        response.encoding = "iso-8859-1"
+        html = response.content
 
-        save_html(settings, settings.data_dir / "debug" / "login.html", response.text)
+        save_html(settings, "login.html", lambda: html)
 
-        ok = ("Sair" in response.text) or ("Controle de Processos" in response.text)
+        ok = (b"Sair" in html) or (b"Controle de Processos" in html)
         if not ok:
-            lowered = response.text.lower()
+            lowered = html.decode("iso-8859-1").lower()
             if "usuário ou senha" in lowered or "inval" in lowered:
                 raise SEILoginError("Credenciais inválidas.")
             if "bloqueado" in lowered or "bloqueio" in lowered:
@@ -309,53 +404,50 @@ def login_sei(session: requests.Session, settings: Settings, user: str, pwd: str
             raise SEILoginError("Login não confirmado - verifique credenciais.")
 
         log.info("Autenticado com sucesso.")
-        return response.text
+        return html
     except requests.RequestException as exc:
         raise SEILoginError(f"Erro de rede durante login: {exc}") from exc
 
 
-def descobrir_url_controle_do_html(settings: Settings, html: str) -> Optional[str]:
-    """Tenta localizar no HTML pós-login o link para 'Controle de Processos'."""
+def descobrir_url_controle_do_html(settings: Settings, html: bytes) -> Optional[str]:
+    """Tenta localizar no HTML pós-login o link para 'Controle de Processos' (busca direta nos bytes)."""
     try:
-        soup = BeautifulSoup(html, "lxml")
-        for tag in soup.find_all("a", href=True):
-            href = tag["href"]
-            if "acao=procedimento_controlar" in href:
-                return absolute_to_sei(settings, href)
-        return None
+        match = RE_CONTROLE_HREF.search(html)
+        if not match:
+            return None
+        return absolute_to_sei(settings, unescape(match.group(1).decode("iso-8859-1")))
     except Exception as exc:  # pragma: no cover
         log.warning("Erro ao descobrir URL de controle: %s", exc)
         return None
 
 
-def abrir_controle(session: requests.Session, settings: Settings, html_pos_login: str) -> tuple[str, str]:
+def abrir_controle(session: requests.Session, settings: Settings, html_pos_login: bytes) -> tuple[bytes, str]:
     """Abre a tela de Controle de Processos e retorna `(html, url)`."""
     try:
         url = descobrir_url_controle_do_html(settings, html_pos_login) or f"{settings.base_url}/sei/controlador.php?acao=procedimento_controlar"
         log.info("Acessando controle de processos: %s", url)
         response = session.get(url, timeout=30, headers=DEFAULT_HEADERS)
         response.raise_for_status()
-        response.encoding = "iso-8859-1"
-        save_html(settings, settings.data_dir / "debug" / "controle_pagina_1.html", response.text)
-        return response.text, url
+        save_html(settings, "controle_pagina_1.html", lambda: response.content)
+        return response.content, url
     except requests.RequestException as exc:
         raise SEIProcessoError(f"Erro ao acessar controle de processos: {exc}") from exc
 
 
-def obter_unidade_atual(settings: Settings, html_controle: str) -> tuple[Optional[str], Optional[str]]:
+def obter_unidade_atual(settings: Settings, html_controle: bytes) -> tuple[Optional[str], Optional[str]]:
     """
     Extrai a unidade atual e a URL de troca de unidade.
 
     O SEI expõe a troca de unidade via um `onclick` em `#lnkInfraUnidade`.
     """
     try:
-        soup = BeautifulSoup(html_controle, "lxml")
-        anchor = soup.select_one("#lnkInfraUnidade")
-        if not anchor or not isinstance(anchor, Tag):
+        anchors = XP_POR_ID(_parse_html(html_controle), elem_id="lnkInfraUnidade")
+        if not anchors:
             log.debug("Elemento #lnkInfraUnidade não encontrado no HTML do controle.")
             return None, None
+        anchor = anchors[0]
 
-        nome_unidade = anchor.get_text(" ", strip=True) or None
+        nome_unidade = _texto(anchor) or None
         onclick = anchor.get("onclick") or ""
         url_troca: Optional[str] = None
 
@@ -372,75 +464,79 @@ def obter_unidade_atual(settings: Settings, html_controle: str) -> tuple[Optiona
         return None, None
 
 
-def carregar_pagina_selecao_unidades(session: requests.Session, settings: Settings, url_troca: str) -> str:
+def carregar_pagina_selecao_unidades(session: requests.Session, settings: Settings, url_troca: str) -> bytes:
     """Carrega a página que lista as unidades disponíveis para o usuário."""
     try:
         log.info("Carregando página de seleção de unidades: %s", url_troca)
         response = session.get(url_troca, timeout=30, headers=DEFAULT_HEADERS)
         response.raise_for_status()
-        response.encoding = "iso-8859-1"
-        save_html(settings, settings.data_dir / "debug" / "selecao_unidades.html", response.text)
-        return response.text
+        save_html(settings, "selecao_unidades.html", lambda: response.content)
+        return response.content
     except requests.RequestException as exc:
         raise SEIProcessoError(f"Erro ao carregar página de seleção de unidades: {exc}") from exc
 
 
+def _normalizar_nome_unidade(nome: str) -> str:
+    """Normaliza o nome de uma unidade para comparação (maiúsculas e espaços colapsados)."""
+    return RE_ESPACOS.sub(" ", nome.strip().upper()).strip()
+
+
 def selecionar_unidade_sei(
     session: requests.Session,
     settings: Settings,
-    html_selecao: str,
+    html_selecao: bytes,
     unidade_desejada: str,
     url_troca_origem: str,
-) -> tuple[bool, Optional[str]]:
+) -> tuple[bool, Optional[bytes]]:
     """
     Seleciona a unidade desejada na tela de unidades e retorna (sucesso, html_resultado).
 
     Implementação baseada em scraping do formulário HTML do SEI.
     """
     try:
-        soup = BeautifulSoup(html_selecao, "lxml")
-        tabela = soup.select_one("table[id^='infraTable'], table.infraTable")
-        if not tabela:
-            tabelas = soup.find_all("table")
-            for tab in tabelas:
-                caption = tab.find("caption")
-                if caption and "unidade" in caption.get_text(" ", strip=True).lower():
+        root = _parse_html(html_selecao)
+        tabelas = XP_TABELAS_INFRA(root)
+        tabela = tabelas[0] if tabelas else None
+        if tabela is None:
+            for tab in root.iter("table"):
+                captions = XP_CAPTION(tab)
+                if captions and "unidade" in _texto(captions[0]).lower():
                     tabela = tab
                     break
 
-        if not tabela:
+        if tabela is None:
             log.warning("Tabela de unidades não encontrada na página de seleção.")
-            save_html(settings, settings.data_dir / "debug" / "selecao_unidades_debug.html", html_selecao)
+            save_html(settings, "selecao_unidades_debug.html", lambda: html_selecao)
             return False, None
 
-        linhas = tabela.select("tbody tr") or tabela.select("tr")
-        linhas = [linha for linha in linhas if isinstance(linha, Tag) and linha.select("th") == []]
-        unidade_desejada_normalizada = re.sub(r"\s+", " ", unidade_desejada.strip().upper()).strip()
+        unidade_desejada_normalizada = _normalizar_nome_unidade(unidade_desejada)
 
-        for linha in linhas:
-            if not isinstance(linha, Tag):
-                continue
-            celulas = linha.select("td")
-            if len(celulas) < 2:
-                continue
-            texto_unidade = celulas[1].get_text(" ", strip=True)
-            texto_limpo = re.sub(r"\s+", " ", texto_unidade.strip().upper()).strip()
-            if texto_limpo != unidade_desejada_normalizada:
-                continue
+        def e_unidade_desejada(linha: HtmlElement) -> bool:
+            return _normalizar_nome_unidade(_texto(XP_CELULAS(linha)[1])) == unidade_desejada_normalizada
 
-            radio = linha.select_one('input[type="radio"][name="chkInfraItem"]')
-            if not radio or not isinstance(radio, Tag):
+        # O XPath filtra as candidatas dentro do lxml, mas não normaliza o nome como `_texto` (ex.: junta
+        # `A<br>B` como "AB", sem espaço), então cada acerto é conferido em Python. O laço completo só roda
+        # quando nenhum acerto se confirma (ex.: minúsculas acentuadas, NBSP ou `<br>` no nome).
+        candidatas = XP_LINHA_UNIDADE(tabela, nome=unidade_desejada_normalizada)
+        linhas = [linha for linha in candidatas if e_unidade_desejada(linha)]
+        if not linhas:
+            linhas = [linha for linha in XP_LINHAS_DADOS(tabela) if e_unidade_desejada(linha)]
+
+        for linha in linhas:
+            radios = XP_RADIO_UNIDADE(linha)
+            if not radios:
                 log.warning("Radio button não encontrado para a unidade %s", unidade_desejada)
                 continue
-            valor_unidade = radio.get("value")
+            valor_unidade = radios[0].get("value")
             if not valor_unidade:
                 log.warning("Valor do radio button não encontrado para a unidade %s", unidade_desejada)
                 continue
 
-            form = soup.select_one("form#frmInfraSelecaoUnidade, form")
-            if not form or not isinstance(form, Tag):
+            forms = XP_FORM_SELECAO_UNIDADE(root) or XP_FORMS(root)
+            if not forms:
                 log.warning("Formulário não encontrado na página de seleção.")
                 return False, None
+            form = forms[0]
 
             data = serializar_formulario(form)
             data["selInfraUnidades"] = valor_unidade
@@ -449,22 +545,21 @@ def selecionar_unidade_sei(
             action = form.get("action", "")
             url_action = absolute_to_sei(settings, action) if action else url_troca_origem
 
-            headers = dict(DEFAULT_HEADERS)
-            headers["Referer"] = url_troca_origem
-            headers["Content-Type"] = "application/x-www-form-urlencoded"
-
             log.info("Selecionando unidade SEI: %s (ID: %s)", unidade_desejada, valor_unidade)
-            response = session.post(url_action, data=data, headers=headers, timeout=30, allow_redirects=True)
+            # Os DEFAULT_HEADERS já estão na sessão e o requests define o Content-Type do `data=` (form).
+            response = session.post(
+                url_action, data=data, headers={"Referer": url_troca_origem}, timeout=30, allow_redirects=True
+            )
             response.raise_for_status()
-            response.encoding = "iso-8859-1"
+            html_resultado = response.content
 
-            save_html(settings, settings.data_dir / "debug" / "troca_unidade_resultado.html", response.text)
+            save_html(settings, "troca_unidade_resultado.html", lambda: html_resultado)
 
-            if "Controle de Processos" in response.text or "procedimento_controlar" in response.text:
+            if b"Controle de Processos" in html_resultado or b"procedimento_controlar" in html_resultado:
                 log.info("Unidade SEI alterada com sucesso para: %s", unidade_desejada)
-                return True, response.text
+                return True, html_resultado
             log.warning("Resposta da troca de unidade não parece ter sido bem-sucedida.")
-            return False, response.text
+            return False, html_resultado
 
         log.warning("Unidade SEI '%s' não encontrada na lista de unidades disponíveis.", unidade_desejada)
         return False, None
@@ -475,7 +570,7 @@ def selecionar_unidade_sei(
         return False, None
 
 
-@dataclass
+@dataclass(slots=True)
 class Processo:
     """Modelo de processo (metadados que aparecem no Controle de Processos)."""
     numero_processo: str
@@ -495,9 +590,14 @@ class Processo:
     eh_sigiloso: bool = False
     assinantes: List[str] = field(default_factory=list)
     metadados: Dict[str, Any] = field(default_factory=dict)
+    # Chave de deduplicação, calculada uma vez na criação (ver `_adicionar_processos`).
+    dedup_key: str = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self) -> None:
+        self.dedup_key = self.id_procedimento or self.numero_processo or ""
 
-@dataclass
+
+@dataclass(slots=True)
 class PaginationInfo:
     """Metadados de paginação inferidos da tela de Controle de Processos."""
     total_registros: int
@@ -506,43 +606,59 @@ class PaginationInfo:
     itens_por_pagina: int
 
 
-def _get_attr_str(tag: Optional[Tag], attr: str, default: str = "") -> str:
-    """Obtém um atributo de uma Tag do BeautifulSoup garantindo retorno em string."""
-    if not tag:
-        return default
-    value = tag.get(attr, default)
-    if isinstance(value, list):
-        return value[0] if value else default
-    return str(value) if value else default
+@dataclass(slots=True)
+class PaginationState:
+    """Payload do formulário de paginação de um grupo, serializado uma vez e reaproveitado por página."""
+    grupo: Literal["Recebidos", "Gerados"]
+    base_payload: Dict[str, str]
+    url_action: str
+    select_superior: str
+    select_inferior: str
+    hidden_pagina: str
+
+    def payload(self, pagina: int) -> Dict[str, str]:
+        """Cópia do payload base apontando os campos de paginação para `pagina` (0-based)."""
+        data = dict(self.base_payload)
+        alvo = str(pagina)
+        if self.select_superior in data:
+            data[self.select_superior] = alvo
+        if self.select_inferior in data:
+            data[self.select_inferior] = alvo
+        data[self.hidden_pagina] = alvo
+        return data
+
+    def mesmo_formulario(self, outro: PaginationState) -> bool:
+        """
+        Indica se `outro` submete o mesmo formulário, ignorando os campos do próprio grupo.
+
+        Os `hdn<Grupo>*` (página atual, itens listados) e os selects de paginação mudam a cada página
+        por natureza; qualquer outra diferença indica um formulário com estado (tokens, filtros).
+        """
+        proprios = (f"hdn{self.grupo}", f"sel{self.grupo}Paginacao")
+
+        def comparaveis(payload: Dict[str, str]) -> Dict[str, str]:
+            return {k: v for k, v in payload.items() if not k.startswith(proprios)}
+
+        return self.url_action == outro.url_action and comparaveis(self.base_payload) == comparaveis(
+            outro.base_payload
+        )
 
 
 def canonizar_processo(txt: str) -> str:
     """Normaliza o número do processo (remove espaços inconsistentes e NBSP)."""
     txt = txt.replace("\xa0", " ")
-    txt = re.sub(r"\.\s+", ".", txt)
-    txt = re.sub(r"\s*/\s*", "/", txt)
-    txt = re.sub(r"\s*-\s*", "-", txt)
+    txt = RE_PONTO_ESPACOS.sub(".", txt)
+    txt = RE_BARRA_ESPACOS.sub("/", txt)
+    txt = RE_HIFEN_ESPACOS.sub("-", txt)
     return txt.strip()
 
 
-def extrair_id_procedimento_da_url(url: str) -> str:
-    """Extrai `id_procedimento` dos parâmetros da URL do processo."""
-    try:
-        parsed = urlparse(url)
-        params = parse_qs(parsed.query)
-        return params.get("id_procedimento", [""])[0]
-    except Exception:
-        return ""
-
-
-def extrair_hash_da_url(url: str) -> str:
-    """Extrai `infra_hash` dos parâmetros da URL do processo."""
-    try:
-        parsed = urlparse(url)
-        params = parse_qs(parsed.query)
-        return params.get("infra_hash", [""])[0]
-    except Exception:
-        return ""
+def extrair_ids_da_url(url: str) -> tuple[str, str]:
+    """Extrai `(id_procedimento, infra_hash)` dos parâmetros da URL do processo (primeira ocorrência)."""
+    ids: Dict[str, str] = {}
+    for match in RE_URL_IDS.finditer(url):
+        ids.setdefault(match.group(1), match.group(2))
+    return ids.get("id_procedimento", ""), ids.get("infra_hash", "")
 
 
 def parse_tooltip(onmouseover: Optional[str]) -> tuple[Optional[str], Optional[str]]:
@@ -557,58 +673,73 @@ def parse_tooltip(onmouseover: Optional[str]) -> tuple[Optional[str], Optional[s
     return None, None
 
 
-def extrair_processo_da_linha(settings: Settings, linha: Tag, categoria: Literal["Recebidos", "Gerados"]) -> Optional[Processo]:
-    """Converte uma `<tr>` do SEI em um `Processo`."""
-    try:
-        link_processo = linha.select_one('a[href*="acao=procedimento_trabalhar"]')
-        if not link_processo or not isinstance(link_processo, Tag):
-            return None
+def extrair_id_e_url(settings: Settings, linha: HtmlElement) -> Optional[tuple[str, str, str, HtmlElement]]:
+    """
+    Localiza o link do processo em uma `<tr>` e retorna `(id_procedimento, hash, url, link)`.
 
-        txt = link_processo.get_text(" ", strip=True)
-        title_attr = _get_attr_str(link_processo, "title")
-        href_attr = _get_attr_str(link_processo, "href")
-        match = RE_PROCESSO.search(txt) or RE_PROCESSO.search(title_attr) or RE_PROCESSO.search(href_attr)
-        if not match:
+    É a parte barata da extração: permite descartar linhas repetidas antes de parsear o restante.
+    """
+    try:
+        links_processo = XP_LINK_PROCESSO(linha)
+        if not links_processo:
             return None
+        link_processo = links_processo[0]
 
-        numero_processo = canonizar_processo(match.group(0))
+        href_attr = link_processo.get("href", "")
         if not href_attr:
             return None
         url = absolute_to_sei(settings, href_attr)
+        id_procedimento, hash_proc = extrair_ids_da_url(url)
+        return id_procedimento, hash_proc, url, link_processo
+    except Exception as exc:  # pragma: no cover
+        log.debug("Erro ao localizar link do processo na linha: %s", exc)
+        return None
 
-        classes = link_processo.get("class", [])
-        if isinstance(classes, str):
-            classes = [classes]
-        visualizado = "processoVisualizado" in classes
 
-        id_procedimento = extrair_id_procedimento_da_url(url)
-        hash_proc = extrair_hash_da_url(url)
+def extrair_detalhes_da_linha(
+    linha: HtmlElement,
+    categoria: Literal["Recebidos", "Gerados"],
+    id_procedimento: str,
+    hash_proc: str,
+    url: str,
+    link_processo: HtmlElement,
+) -> Optional[Processo]:
+    """Completa o `Processo` de uma `<tr>` cujo link já foi localizado por `extrair_id_e_url`."""
+    try:
+        txt = _texto(link_processo)
+        title_attr = link_processo.get("title", "")
+        href_attr = link_processo.get("href", "")
+        match = RE_PROCESSO.search(txt) or RE_PROCESSO.search(title_attr) or RE_PROCESSO.search(href_attr)
+        if not match:
+            return None
+
+        numero_processo = canonizar_processo(match.group(0))
+        visualizado = "processoVisualizado" in link_processo.get("class", "").split()
 
-        onmouseover = _get_attr_str(link_processo, "onmouseover")
+        onmouseover = link_processo.get("onmouseover", "")
         titulo, tipo_especificidade = parse_tooltip(onmouseover if onmouseover else None)
 
         responsavel_nome = None
         responsavel_cpf = None
-        link_responsavel = linha.select_one('a[href*="acao=procedimento_atribuicao_listar"]')
-        if link_responsavel and isinstance(link_responsavel, Tag):
-            title_resp = _get_attr_str(link_responsavel, "title")
+        links_responsavel = XP_LINK_RESPONSAVEL(linha)
+        if links_responsavel:
+            link_responsavel = links_responsavel[0]
+            title_resp = link_responsavel.get("title", "")
             responsavel_nome = title_resp.replace("Atribuído para ", "") if title_resp else None
-            responsavel_cpf = link_responsavel.get_text(strip=True)
+            responsavel_cpf = _texto(link_responsavel, "")
 
         marcadores: List[str] = []
-        for img in linha.select("img.imagemStatus"):
-            if not isinstance(img, Tag):
-                continue
-            parent_link = img.find_parent("a")
-            if parent_link and isinstance(parent_link, Tag):
-                onmouseover_attr = _get_attr_str(parent_link, "onmouseover")
+        for img in XP_IMG_STATUS(linha):
+            parent_link = next(img.iterancestors("a"), None)
+            if parent_link is not None:
+                onmouseover_attr = parent_link.get("onmouseover", "")
                 if onmouseover_attr:
-                    tooltip_match = re.search(r"infraTooltipMostrar\('([^']*)'", onmouseover_attr)
+                    tooltip_match = RE_TOOLTIP_FIRST.search(onmouseover_attr)
                     if tooltip_match:
                         marcadores.append(tooltip_match.group(1).strip())
 
-        tem_documentos_novos = bool(linha.select_one('img[src*="exclamacao.svg"]'))
-        tem_anotacoes = bool(linha.select_one('img[src*="anotacao"]'))
+        tem_documentos_novos = bool(XP_IMG_DOCUMENTOS_NOVOS(linha))
+        tem_anotacoes = bool(XP_IMG_ANOTACAO(linha))
 
         return Processo(
             numero_processo=numero_processo,
@@ -630,28 +761,34 @@ def extrair_processo_da_linha(settings: Settings, linha: Tag, categoria: Literal
         return None
 
 
-def extrair_processos(settings: Settings, html_controle: str) -> List[Processo]:
-    """Extrai processos (Recebidos e Gerados) do HTML da página de controle."""
+def _categoria_da_linha(linha: HtmlElement) -> Literal["Recebidos", "Gerados"]:
+    """Identifica o grupo de uma `<tr>` pela tabela `tblProcessos*` ancestral."""
+    tabela_id = XP_TABELA_DA_LINHA(linha)
+    return "Recebidos" if tabela_id and tabela_id[0] == "tblProcessosRecebidos" else "Gerados"
+
+
+def extrair_processos(settings: Settings, root: HtmlElement) -> List[Processo]:
+    """Extrai processos (Recebidos e Gerados) da árvore da página de controle (ver `_parse_html`)."""
     try:
-        soup = BeautifulSoup(html_controle, "lxml")
         processos: List[Processo] = []
         processos_ids: Set[str] = set()
 
-        tabela_recebidos = soup.select_one("#tblProcessosRecebidos")
-        if tabela_recebidos:
-            for linha in tabela_recebidos.select("tr[id^='P']"):
-                proc = extrair_processo_da_linha(settings, linha, "Recebidos")
-                if proc and proc.id_procedimento and proc.id_procedimento not in processos_ids:
-                    processos.append(proc)
-                    processos_ids.add(proc.id_procedimento)
-
-        tabela_gerados = soup.select_one("#tblProcessosGerados")
-        if tabela_gerados:
-            for linha in tabela_gerados.select("tr[id^='P']"):
-                proc = extrair_processo_da_linha(settings, linha, "Gerados")
-                if proc and proc.id_procedimento and proc.id_procedimento not in processos_ids:
-                    processos.append(proc)
-                    processos_ids.add(proc.id_procedimento)
+        # Uma única consulta traz as linhas das duas tabelas, em ordem de documento.
+        linhas = [(_categoria_da_linha(linha), linha) for linha in XP_LINHAS_PROCESSOS(root)]
+        # Ordenação estável: Recebidos primeiro, mantendo sua precedência na deduplicação.
+        linhas.sort(key=lambda item: item[0] != "Recebidos")
+        for categoria, linha in linhas:
+            ids = extrair_id_e_url(settings, linha)
+            if ids is None:
+                continue
+            id_procedimento = ids[0]
+            # Linhas sem id ou já vistas (ex.: processo em Recebidos e Gerados) não são parseadas.
+            if not id_procedimento or id_procedimento in processos_ids:
+                continue
+            proc = extrair_detalhes_da_linha(linha, categoria, *ids)
+            if proc:
+                processos.append(proc)
+                processos_ids.add(id_procedimento)
 
         return processos
     except Exception as exc:
@@ -663,11 +800,11 @@ def _parse_caption_info(texto: str) -> tuple[int, int]:
     total_registros = 0
     itens_por_pagina = 0
 
-    m_total = re.search(r"(\d+)\s+registros", texto)
+    m_total = RE_CAPTION_TOTAL.search(texto)
     if m_total:
         total_registros = int(m_total.group(1))
 
-    m_intervalo = re.search(r"-\s*(\d+)\s*a\s*(\d+)", texto)
+    m_intervalo = RE_CAPTION_INTERVALO.search(texto)
     if m_intervalo:
         inicio = int(m_intervalo.group(1))
         fim = int(m_intervalo.group(2))
@@ -679,28 +816,27 @@ def _parse_caption_info(texto: str) -> tuple[int, int]:
     return total_registros, itens_por_pagina
 
 
-def obter_paginacao_info(html_controle: str) -> Dict[str, PaginationInfo]:
-    """Lê os campos hidden/caption para inferir paginação de Recebidos/Gerados."""
-    soup = BeautifulSoup(html_controle, "lxml")
+def obter_paginacao_info(root: HtmlElement) -> Dict[str, PaginationInfo]:
+    """Lê os campos hidden/caption da árvore da página para inferir paginação de Recebidos/Gerados."""
     info: Dict[str, PaginationInfo] = {}
 
     for grupo in ("Recebidos", "Gerados"):
-        tabela = soup.select_one(f"#tblProcessos{grupo}")
+        tabelas = XP_POR_ID(root, elem_id=f"tblProcessos{grupo}")
         total_registros = 0
         itens_por_pagina = 0
 
-        if tabela:
-            caption = tabela.find("caption")
-            if caption:
-                total_registros, itens_por_pagina = _parse_caption_info(caption.get_text(" ", strip=True))
-            linhas = tabela.select("tr[id^='P']")
+        if tabelas:
+            tabela = tabelas[0]
+            captions = XP_CAPTION(tabela)
+            if captions:
+                total_registros, itens_por_pagina = _parse_caption_info(_texto(captions[0]))
+            linhas = XP_LINHAS_P(tabela)
             if itens_por_pagina <= 0 and linhas:
                 itens_por_pagina = len(linhas)
             if total_registros <= 0 and linhas:
                 total_registros = len(linhas)
 
-        hidden_nro = soup.select_one(f"#hdn{grupo}NroItens")
-        valor_nro = _get_attr_str(hidden_nro, "value") if hidden_nro else None
+        valor_nro = _valor_por_id(root, f"hdn{grupo}NroItens")
         if valor_nro:
             try:
                 nro_itens = int(valor_nro)
@@ -709,13 +845,11 @@ def obter_paginacao_info(html_controle: str) -> Dict[str, PaginationInfo]:
             except ValueError:
                 pass
 
-        hidden_itens = soup.select_one(f"#hdn{grupo}Itens")
-        valor_itens = _get_attr_str(hidden_itens, "value") if hidden_itens else None
+        valor_itens = _valor_por_id(root, f"hdn{grupo}Itens")
         if total_registros <= 0 and valor_itens:
             total_registros = len([item for item in valor_itens.split(",") if item])
 
-        hidden_pagina = soup.select_one(f"#hdn{grupo}PaginaAtual")
-        valor_pagina = _get_attr_str(hidden_pagina, "value") if hidden_pagina else None
+        valor_pagina = _valor_por_id(root, f"hdn{grupo}PaginaAtual")
         pagina_atual = 0
         if valor_pagina:
             try:
@@ -737,110 +871,413 @@ def obter_paginacao_info(html_controle: str) -> Dict[str, PaginationInfo]:
     return info
 
 
+def preparar_paginacao(settings: Settings, root: HtmlElement, grupo: Literal["Recebidos", "Gerados"]) -> PaginationState:
+    """
+    Serializa uma única vez o formulário `frmProcedimentoControlar` para paginar um grupo.
+
+    O payload resultante é reaproveitado por `submeter_paginacao` em todas as páginas do grupo.
+    """
+    forms = XP_FORM_CONTROLE(root)
+    if not forms:
+        raise SEIProcessoError("Formulário de controle não encontrado para paginação.")
+    form = forms[0]
+
+    estado = PaginationState(
+        grupo=grupo,
+        base_payload=serializar_formulario(form),
+        url_action=absolute_to_sei(settings, form.get("action", "")),
+        select_superior=f"sel{grupo}PaginacaoSuperior",
+        select_inferior=f"sel{grupo}PaginacaoInferior",
+        hidden_pagina=f"hdn{grupo}PaginaAtual",
+    )
+    if estado.hidden_pagina not in estado.base_payload:
+        raise SEIProcessoError(f"Paginação indisponível para {grupo}.")
+    return estado
+
+
 def submeter_paginacao(
     session: requests.Session,
     settings: Settings,
-    html_atual: str,
-    grupo: Literal["Recebidos", "Gerados"],
+    estado: PaginationState,
     pagina_destino: int,
     controle_url: str,
-) -> str:
+) -> bytes:
     """
     Submete o formulário `frmProcedimentoControlar` para trocar a página de um grupo.
 
     `pagina_destino` é 0-based (o SEI costuma trabalhar com índices numéricos internos).
+    Retorna os bytes crus da resposta, que vão direto para o parser.
     """
-    soup = BeautifulSoup(html_atual, "lxml")
-    form = soup.select_one("#frmProcedimentoControlar")
-    if not form:
-        raise SEIProcessoError("Formulário de controle não encontrado para paginação.")
+    data = estado.payload(pagina_destino)
+    # Só o Referer: os DEFAULT_HEADERS já vêm da sessão (`create_session`) e o requests mescla os dois.
+    resposta = session.post(estado.url_action, data=data, headers={"Referer": controle_url}, timeout=60)
+    resposta.raise_for_status()
 
-    data = serializar_formulario(form)
-    alvo = str(pagina_destino)
+    # Chamada por página: com o debug desligado (caso normal) nem o nome do arquivo nem a closure são montados.
+    if settings.save_debug_html:
+        save_html(settings, f"controle_{estado.grupo.lower()}_{pagina_destino + 1}.html", lambda: resposta.content)
+    return resposta.content
 
-    select_superior = f"sel{grupo}PaginacaoSuperior"
-    select_inferior = f"sel{grupo}PaginacaoInferior"
-    hidden_pagina = f"hdn{grupo}PaginaAtual"
 
-    if select_superior in data:
-        data[select_superior] = alvo
-    if select_inferior in data:
-        data[select_inferior] = alvo
-    if hidden_pagina in data:
-        data[hidden_pagina] = alvo
-    else:
-        raise SEIProcessoError(f"Paginação indisponível para {grupo}.")
+def _adicionar_processos(
+    destino: Dict[str, Processo],
+    novos: Iterable[Processo],
+    contagem: Dict[str, int],
+) -> None:
+    """
+    Adiciona processos sem duplicar (chave `Processo.dedup_key`: `id_procedimento`/`numero_processo`).
+
+    `destino` é indexado pela própria chave e preserva a ordem de inserção; `contagem` acumula quantos
+    processos de cada categoria foram de fato adicionados.
+    """
+    for processo in novos:
+        chave = processo.dedup_key
+        if chave and chave not in destino:
+            destino[chave] = processo
+            contagem[processo.categoria] += 1
 
-    action = _get_attr_str(form, "action")
-    url_action = absolute_to_sei(settings, action)
-    headers = dict(DEFAULT_HEADERS)
-    headers.setdefault("Referer", controle_url)
 
-    resposta = session.post(url_action, data=data, headers=headers, timeout=60)
-    resposta.raise_for_status()
-    resposta.encoding = "iso-8859-1"
+class _PoolDaemon:
+    """
+    Pool fixo de threads daemon com a parte da interface de `ThreadPoolExecutor` usada na paginação.
 
-    save_html(settings, settings.data_dir / "debug" / f"controle_{grupo.lower()}_{pagina_destino + 1}.html", resposta.text)
-    return resposta.text
+    As threads do `ThreadPoolExecutor` não são daemon e o interpretador espera por elas ao sair: depois
+    de um erro ou Ctrl+C o processo ficaria vivo até cada POST em voo terminar (até o timeout, mais os
+    retries). Aqui elas são abandonadas na saída, e `shutdown(cancel_futures=True)` também impede que
+    uma tarefa ainda na fila comece depois disso.
+    """
 
+    def __init__(self, max_workers: int, nome: str) -> None:
+        self._fila: queue.SimpleQueue = queue.SimpleQueue()
+        self._encerrado = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._trabalhar, name=f"{nome}_{i}", daemon=True) for i in range(max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _trabalhar(self) -> None:
+        while (tarefa := self._fila.get()) is not None:
+            futuro, funcao, args = tarefa
+            if self._encerrado.is_set():
+                futuro.cancel()
+            if not futuro.set_running_or_notify_cancel():
+                continue
+            try:
+                futuro.set_result(funcao(*args))
+            except BaseException as exc:
+                futuro.set_exception(exc)
+
+    def submit(self, funcao: Callable[..., Any], *args: Any) -> Future:
+        if self._encerrado.is_set():
+            raise RuntimeError("Pool encerrado.")
+        futuro: Future = Future()
+        self._fila.put((futuro, funcao, args))
+        return futuro
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        if cancel_futures:
+            self._encerrado.set()
+            while True:
+                try:
+                    tarefa = self._fila.get_nowait()
+                except queue.Empty:
+                    break
+                if tarefa is not None:
+                    tarefa[0].cancel()
+        for _ in self._threads:
+            self._fila.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
 
-def _adicionar_processos(destino: List[Processo], novos: Iterable[Processo]) -> None:
-    """Adiciona processos sem duplicar (chave por `id_procedimento`/`numero_processo`)."""
-    vistos: Set[str] = {proc.id_procedimento or proc.numero_processo for proc in destino}
-    for processo in novos:
-        chave = processo.id_procedimento or processo.numero_processo
-        if chave and chave not in vistos:
-            destino.append(processo)
-            vistos.add(chave)
+
+def _paginar_grupo(
+    session: requests.Session,
+    settings: Settings,
+    estado: PaginationState,
+    info: PaginationInfo,
+    controle_url: str,
+    requisicoes: _PoolDaemon,
+    parar: Future,
+) -> List[List[Processo]]:
+    """
+    Carrega as páginas restantes de um grupo e retorna os processos de cada página, em ordem.
+
+    A primeira página extra é sempre carregada sozinha, com o formulário inicial (`estado`). Se o
+    formulário devolvido por ela for o mesmo (só muda o índice da página), a paginação não depende de
+    estado e as demais páginas são submetidas em paralelo reaproveitando o payload inicial. Caso
+    contrário (ou com `settings.paginacao_paralela` desligado), cada página é submetida com o
+    formulário da página anterior, uma por vez.
+
+    Toda submissão roda em `requisicoes`, o pool compartilhado pelos dois grupos: o tamanho dele é o
+    total de requisições simultâneas ao SEI, e esta função só coordena a ordem das páginas.
+
+    `parar` é o sinal de parada compartilhado pelos dois grupos: a primeira tarefa que falha o conclui
+    com a própria exceção (e o Ctrl+C o cancela). Depois disso nenhuma página nova é enviada ao SEI.
+    """
+    grupo = estado.grupo
+    paginas = range(info.pagina_atual + 1, info.total_paginas)
+    if not paginas:
+        return []
+
+    def verificar_parada() -> None:
+        if parar.done():
+            raise CancelledError(f"Paginação de {grupo} interrompida.")
+
+    def executar(funcao: Callable[..., Any], args: tuple) -> Any:
+        # Verificado também no worker: uma página que já estava na fila não sai depois de uma falha.
+        verificar_parada()
+        try:
+            return funcao(*args)
+        except BaseException as exc:
+            try:
+                parar.set_exception(exc)
+            except InvalidStateError:
+                pass  # outra tarefa já falhou (ou houve Ctrl+C): vale o primeiro sinal
+            raise
+
+    def enviar(funcao: Callable[..., Any], *args: Any) -> Future:
+        verificar_parada()
+        return requisicoes.submit(executar, funcao, args)
+
+    def carregar(estado_pagina: PaginationState, pagina: int) -> HtmlElement:
+        log.info("Carregando página %s/%s de %s", pagina + 1, info.total_paginas, grupo)
+        return _parse_html(submeter_paginacao(session, settings, estado_pagina, pagina, controle_url))
+
+    def carregar_com_formulario(
+        estado_pagina: PaginationState, pagina: int, preparar_proximo: bool
+    ) -> tuple[List[Processo], Optional[PaginationState]]:
+        # A árvore da página só existe dentro desta chamada: quem espera pelo resultado recebe apenas
+        # os processos e, se pedido, o formulário da próxima página, e não retém o DOM inteiro.
+        root_pagina = carregar(estado_pagina, pagina)
+        proximo = preparar_paginacao(settings, root_pagina, grupo) if preparar_proximo else None
+        return extrair_processos(settings, root_pagina), proximo
+
+    restantes = paginas[1:]
+    processos_pagina, proximo = enviar(carregar_com_formulario, estado, paginas[0], bool(restantes)).result()
+    resultado = [processos_pagina]
+    if proximo is None:
+        return resultado
+
+    if settings.paginacao_paralela and estado.mesmo_formulario(proximo):
+        # Cada worker extrai os processos logo após receber a página, então o HTML e a árvore de cada
+        # página são liberados em seguida, em vez de ficarem todos retidos até o fim do grupo.
+        def carregar_e_extrair(pagina: int) -> List[Processo]:
+            return extrair_processos(settings, carregar(estado, pagina))
+
+        futuros: List[Future] = []
+        try:
+            for pagina in restantes:
+                futuros.append(enviar(carregar_e_extrair, pagina))
+            resultado.extend(futuro.result() for futuro in futuros)
+        except BaseException:
+            # Uma página falhou: as que ainda não começaram não chegam a ser enviadas ao SEI.
+            for futuro in futuros:
+                futuro.cancel()
+            raise
+        return resultado
+
+    log.debug("Paginação de %s segue página a página (formulário depende da página anterior).", grupo)
+    for pagina in restantes:
+        processos_pagina, seguinte = enviar(carregar_com_formulario, proximo, pagina, pagina != restantes[-1]).result()
+        resultado.append(processos_pagina)
+        if seguinte is not None:
+            proximo = seguinte
+    return resultado
 
 
 def coletar_processos_com_paginacao(
     session: requests.Session,
     settings: Settings,
-    html_inicial: str,
+    html_inicial: bytes,
     controle_url: str,
 ) -> List[Processo]:
     """
     Coleta todos os processos navegando pelas páginas de Recebidos e Gerados.
 
     O SEI tem paginação separada por grupo, então o script pagina cada um e acumula.
+    Os dois grupos são paginados ao mesmo tempo e as páginas de cada grupo também são carregadas em
+    paralelo (ver `_paginar_grupo`), todas num único pool de `settings.max_conexoes` requisições; o
+    resultado é acumulado na ordem Recebidos → Gerados.
     """
-    processos: List[Processo] = []
+    processos: Dict[str, Processo] = {}
+    contagem = {"Recebidos": 0, "Gerados": 0}
 
-    info_inicial = obter_paginacao_info(html_inicial)
-    processos_iniciais = extrair_processos(settings, html_inicial)
-    _adicionar_processos(processos, processos_iniciais)
+    # Um único parse da página inicial alimenta a paginação, a extração e os formulários dos grupos.
+    root_inicial = _parse_html(html_inicial)
+    info_inicial = obter_paginacao_info(root_inicial)
+    processos_iniciais = extrair_processos(settings, root_inicial)
+    _adicionar_processos(processos, processos_iniciais, contagem)
 
     log.info(
         "Total inicial de processos: %s (%s Recebidos, %s Gerados)",
         len(processos),
-        sum(1 for p in processos if p.categoria == "Recebidos"),
-        sum(1 for p in processos if p.categoria == "Gerados"),
+        contagem["Recebidos"],
+        contagem["Gerados"],
     )
 
-    info_recebidos = info_inicial.get("Recebidos")
-    if info_recebidos and info_recebidos.total_paginas > 1:
-        html_receb = html_inicial
-        for pagina in range(info_recebidos.pagina_atual + 1, info_recebidos.total_paginas):
-            log.info("Carregando página %s/%s de Recebidos (acumulado: %s)", pagina + 1, info_recebidos.total_paginas, len(processos))
-            html_receb = submeter_paginacao(session, settings, html_receb, "Recebidos", pagina, controle_url)
-            _adicionar_processos(processos, extrair_processos(settings, html_receb))
-
-    info_gerados = info_inicial.get("Gerados")
-    if info_gerados and info_gerados.total_paginas > 1:
-        html_ger = html_inicial
-        for pagina in range(info_gerados.pagina_atual + 1, info_gerados.total_paginas):
-            log.info("Carregando página %s/%s de Gerados (acumulado: %s)", pagina + 1, info_gerados.total_paginas, len(processos))
-            html_ger = submeter_paginacao(session, settings, html_ger, "Gerados", pagina, controle_url)
-            _adicionar_processos(processos, extrair_processos(settings, html_ger))
+    grupos: tuple[Literal["Recebidos", "Gerados"], ...] = ("Recebidos", "Gerados")
+    # Os formulários são serializados aqui, antes das threads, para a árvore inicial nunca ser
+    # percorrida por duas threads ao mesmo tempo.
+    pendentes = [
+        (preparar_paginacao(settings, root_inicial, grupo), info)
+        for grupo in grupos
+        if (info := info_inicial.get(grupo)) is not None and info.total_paginas > 1
+    ]
+    # Daqui em diante só os payloads são usados: a árvore inicial não fica retida durante a paginação.
+    del root_inicial
+    if pendentes:
+        # `requisicoes` atende as páginas dos dois grupos; `coordenadores` só roda um `_paginar_grupo` por
+        # grupo, esperando as páginas dele (fora do pool de requisições, para não ocupar uma vaga esperando).
+        # Threads daemon (ver `_PoolDaemon`): um erro ou Ctrl+C encerra o processo sem esperar as
+        # requisições que ainda estão em voo.
+        requisicoes = _PoolDaemon(settings.max_conexoes, "requisicao")
+        coordenadores = _PoolDaemon(len(pendentes), "grupo")
+        parar: Future = Future()
+        try:
+            futuros = [
+                coordenadores.submit(
+                    _paginar_grupo, session, settings, estado, info, controle_url, requisicoes, parar
+                )
+                for estado, info in pendentes
+            ]
+            # Um erro em qualquer página interrompe tudo, sem esperar os grupos terminarem; `parar` traz a
+            # exceção original, e não o `CancelledError` de quem parou por causa dela.
+            aguardando = {parar, *futuros}
+            while len(aguardando) > 1:
+                concluidos, aguardando = wait(aguardando, return_when=FIRST_COMPLETED)
+                if parar.done():
+                    parar.result()
+                for futuro in concluidos:
+                    futuro.result()
+            for futuro in futuros:
+                for processos_pagina in futuro.result():
+                    _adicionar_processos(processos, processos_pagina, contagem)
+        except BaseException:
+            parar.cancel()
+            requisicoes.shutdown(wait=False, cancel_futures=True)
+            coordenadores.shutdown(wait=False, cancel_futures=True)
+            raise
+        requisicoes.shutdown()
+        coordenadores.shutdown()
 
     log.info(
         "Total final de processos: %s (%s Recebidos, %s Gerados)",
         len(processos),
-        sum(1 for p in processos if p.categoria == "Recebidos"),
-        sum(1 for p in processos if p.categoria == "Gerados"),
+        contagem["Recebidos"],
+        contagem["Gerados"],
     )
-    return processos
+    return list(processos.values())
+
+
+# Partes fixas de um `.xlsx` com uma única planilha e sem estilos; só `sheet1.xml` depende dos dados.
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    "</Types>"
+)
+_XLSX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{nome}" sheetId="1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    "</Relationships>"
+)
+_XLSX_SHEET_INICIO = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_XLSX_SHEET_FIM = "</sheetData></worksheet>"
+_XLSX_COLUNAS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+# Nível do deflate do zip: o XML da planilha já comprime bem no nível 1, com bem menos CPU que o padrão (6).
+_XLSX_NIVEL_COMPRESSAO = 1
+
+# Colunas da planilha: são os próprios nomes dos campos do `Processo`, na ordem exportada.
+_CABECALHO = (
+    "numero_processo",
+    "categoria",
+    "visualizado",
+    "titulo",
+    "tipo_especificidade",
+    "responsavel_nome",
+    "responsavel_cpf",
+    "marcadores",
+    "tem_documentos_novos",
+    "tem_anotacoes",
+    "id_procedimento",
+    "hash",
+    "url",
+)
+# Lê todos os campos exportados de um `Processo` numa única chamada (em C) por linha.
+_CAMPOS_EXPORTACAO = attrgetter(*_CABECALHO)
+# Indexado por um bool: `_SIM_NAO[True] == "Sim"`.
+_SIM_NAO = ("Não", "Sim")
+
+
+@lru_cache(maxsize=4096)
+def _texto_xml(valor: str) -> str:
+    """
+    Texto pronto para `<t>` de uma célula: sem caracteres inválidos no XML 1.0 e com `&<>` escapados.
+
+    Em cache porque a maioria das colunas se repete muito entre linhas (categoria, Sim/Não,
+    responsável, tipo, marcadores).
+    """
+    return xml_escape(RE_XML_INVALIDO.sub("", valor))
+
+
+def _gravar_xlsx(
+    path: Path,
+    nome_planilha: str,
+    cabecalho: tuple[str, ...],
+    linhas: Iterable[Iterable[Optional[str]]],
+) -> None:
+    """
+    Grava um `.xlsx` mínimo (1 planilha, só texto) montando o XML à mão.
+
+    As células usam `inlineStr` (sem tabela de strings compartilhadas) e a planilha é escrita linha a
+    linha direto no zip; valores vazios (`""`/`None`) viram células ausentes.
+    """
+    colunas = _XLSX_COLUNAS[: len(cabecalho)]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=_XLSX_NIVEL_COMPRESSAO) as zf:
+        zf.writestr("[Content_Types].xml", _XLSX_CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _XLSX_RELS)
+        zf.writestr("xl/workbook.xml", _XLSX_WORKBOOK.format(nome=xml_escape(nome_planilha, {'"': "&quot;"})))
+        zf.writestr("xl/_rels/workbook.xml.rels", _XLSX_WORKBOOK_RELS)
+
+        with io.TextIOWrapper(zf.open("xl/worksheets/sheet1.xml", "w"), encoding="utf-8") as sheet:
+            sheet.write(_XLSX_SHEET_INICIO)
+            for numero, valores in enumerate(chain((cabecalho,), linhas), 1):
+                celulas = "".join(
+                    f'<c r="{coluna}{numero}" t="inlineStr"><is><t xml:space="preserve">'
+                    f"{_texto_xml(valor)}</t></is></c>"
+                    for coluna, valor in zip(colunas, valores)
+                    if valor
+                )
+                sheet.write(f'<row r="{numero}">{celulas}</row>')
+            sheet.write(_XLSX_SHEET_FIM)
 
 
 def exportar_processos_para_excel(processos: List[Processo], caminho: str) -> Path:
@@ -856,50 +1293,40 @@ def exportar_processos_para_excel(processos: List[Processo], caminho: str) -> Pa
 
     path.parent.mkdir(parents=True, exist_ok=True)
 
-    wb = Workbook()
-    ws = wb.active
-    if ws is None:
-        ws = wb.create_sheet("Processos")
-    else:
-        ws.title = "Processos"
-
-    cabecalho = [
-        "numero_processo",
-        "categoria",
-        "visualizado",
-        "titulo",
-        "tipo_especificidade",
-        "responsavel_nome",
-        "responsavel_cpf",
-        "marcadores",
-        "tem_documentos_novos",
-        "tem_anotacoes",
-        "id_procedimento",
-        "hash",
-        "url",
-    ]
-    ws.append(cabecalho)
-
-    for proc in processos:
-        ws.append(
-            [
-                proc.numero_processo,
-                proc.categoria,
-                "Sim" if proc.visualizado else "Não",
-                proc.titulo or "",
-                proc.tipo_especificidade or "",
-                proc.responsavel_nome or "",
-                proc.responsavel_cpf or "",
-                "; ".join(proc.marcadores),
-                "Sim" if proc.tem_documentos_novos else "Não",
-                "Sim" if proc.tem_anotacoes else "Não",
-                proc.id_procedimento,
-                proc.hash,
-                proc.url,
-            ]
+    def linha(proc: Processo) -> tuple[Optional[str], ...]:
+        (
+            numero,
+            categoria,
+            visualizado,
+            titulo,
+            tipo,
+            resp_nome,
+            resp_cpf,
+            marcadores,
+            docs_novos,
+            anotacoes,
+            id_procedimento,
+            hash_,
+            url,
+        ) = _CAMPOS_EXPORTACAO(proc)
+        return (
+            numero,
+            categoria,
+            _SIM_NAO[visualizado],
+            titulo,
+            tipo,
+            resp_nome,
+            resp_cpf,
+            "; ".join(marcadores) if marcadores else "",
+            _SIM_NAO[docs_novos],
+            _SIM_NAO[anotacoes],
+            id_procedimento,
+            hash_,
+            url,
         )
 
-    wb.save(path)
+    linhas = map(linha, processos)
+    _gravar_xlsx(path, "Processos", _CABECALHO, linhas)
     return path
 
 